@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import argparse
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
 
-import joblib
 import numpy as np
 
 MODEL_DIR = Path("outputs/models/baseline")
@@ -20,11 +20,16 @@ def _normalize_text(text: str | None) -> str:
     return " ".join(cleaned.split()).strip()
 
 
+# Cached per model directory so repeated predictors share one copy of the vectorizer and classifier
+@lru_cache(maxsize=None)
 def _load_artifacts(model_dir: Path = MODEL_DIR) -> Tuple:
     if not model_dir.exists():
         raise FileNotFoundError(
             f"Baseline artifacts not found at {model_dir}. Run the training notebook first." 
         )
+    # Imported here so --help and argument errors don't pay for joblib
+    import joblib
+
     vectorizer = joblib.load(model_dir / "vectorizer.joblib")
     classifier = joblib.load(model_dir / "ovr_lr.joblib")
     labels = (model_dir / "labels.txt").read_text(encoding="utf-8").splitlines()
@@ -33,11 +38,8 @@ def _load_artifacts(model_dir: Path = MODEL_DIR) -> Tuple:
 
 
 def _apply_thresholds(probs: np.ndarray, thresholds: dict, labels: Sequence[str]) -> np.ndarray:
-    output = np.zeros_like(probs, dtype=int)
-    for idx, label in enumerate(labels):
-        thr = thresholds.get(label, 0.5)
-        output[:, idx] = (probs[:, idx] >= thr).astype(int)
-    return output
+    cutoffs = np.array([thresholds.get(label, 0.5) for label in labels], dtype=probs.dtype)
+    return (probs >= cutoffs).astype(int)
 
 
 class BaselineToxicityPredictor:
@@ -3,25 +3,34 @@
 from __future__ import annotations
 
 import argparse
+import os
 import re
 from pathlib import Path
 
 import pandas as pd
 
 DEFAULT_OUTPUT_SUFFIX = "_cleaned"
+WHITESPACE_RUN = re.compile(r"\s+")
 
 
-def normalize_body(text: str | None) -> str:
-    if not isinstance(text, str):
-        return ""
-    stripped = text.strip()
-    if not stripped:
-        return ""
-    lowered = stripped.lower()
-    if lowered.startswith("http://") or lowered.startswith("https://"):
-        return ""
-    lowered = re.sub(r"\s+", " ", lowered)
-    return lowered
+def normalize_bodies(bodies: pd.Series) -> pd.Series:
+    """Lowercase, strip, and collapse whitespace; blank and URL-only bodies become ""."""
+    lowered = bodies.fillna("").astype(str).str.strip().str.lower()
+    is_url = lowered.str.startswith(("http://", "https://"))
+    normalized = lowered.str.replace(WHITESPACE_RUN, " ", regex=True)
+    return normalized.mask(is_url, "")
+
+
+def write_csv_atomic(df: pd.DataFrame, path: Path) -> None:
+    """Write df to a temp file beside path, then os.replace() it so --output may safely equal --input."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
 
 
 def parse_args() -> argparse.Namespace:
@@ -50,7 +59,7 @@ def main() -> None:
         raise ValueError("Input file must include a 'body' column.")
 
     original_count = len(df)
-    df["_normalized_body"] = df["body"].apply(normalize_body)
+    df["_normalized_body"] = normalize_bodies(df["body"])
 
     before_drop = len(df)
     df = df[df["_normalized_body"] != ""].copy()
@@ -79,8 +88,7 @@ def main() -> None:
     deduped = deduped.drop(columns=["_toxic_float"], errors="ignore")
 
     out_path = Path(args.output) if args.output else inp.with_name(f"{inp.stem}{DEFAULT_OUTPUT_SUFFIX}{inp.suffix}")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    deduped.to_csv(out_path, index=False)
+    write_csv_atomic(deduped, out_path)
 
     print(f"Input rows: {original_count}")
     print(f"Removed empty/url-only bodies: {dropped_empty}")
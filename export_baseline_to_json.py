@@ -6,9 +6,13 @@ import argparse
 import json
 from pathlib import Path
 
-import joblib
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 ARTIFACT_NAMES = ["vectorizer.joblib", "ovr_lr.joblib", "labels.txt", "thresholds.json"]
 
 
@@ -39,6 +43,16 @@ def ensure_artifacts_available(artifacts_dir: Path) -> None:
         raise FileNotFoundError(f"Missing artifacts: {missing}")
 
 
+def write_json(path: Path, data, indent: bool = False) -> None:
+    """Serialize ``data`` to ``path`` as UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        path.write_bytes(orjson.dumps(data, option=option))
+        return
+    text = json.dumps(data, ensure_ascii=False, indent=2 if indent else None, default=lambda obj: obj.tolist())
+    path.write_text(text, encoding="utf-8")
+
+
 def export_vectorizer(vectorizer, output_dir: Path, chunk_size: int) -> dict:
     """Serialize TF–IDF parameters and write vocabulary shards."""
     combined_vocab = {}
@@ -65,10 +79,10 @@ def export_vectorizer(vectorizer, output_dir: Path, chunk_size: int) -> dict:
         shard_path = output_dir / f"vocabulary_{idx:03d}.json"
         shard_dict = {term: int(position) for term, position in shard}
         combined_vocab.update(shard_dict)
-        shard_path.write_text(json.dumps(shard_dict, ensure_ascii=False), encoding="utf-8")
+        write_json(shard_path, shard_dict)
         info["vocabulary_files"].append(shard_path.name)
     combined_path = output_dir / "vocabulary_combined.json"
-    combined_path.write_text(json.dumps(combined_vocab, ensure_ascii=False), encoding="utf-8")
+    write_json(combined_path, combined_vocab)
     info["combined_vocabulary"] = combined_path.name
     return info
 
@@ -78,8 +92,8 @@ def export_classifier(classifier, output_dir: Path) -> dict:
     intercepts = np.array([est.intercept_ for est in classifier.estimators_]).reshape(-1)
     coef_path = output_dir / "classifier_coefficients.json"
     intercept_path = output_dir / "classifier_intercepts.json"
-    coef_path.write_text(json.dumps(coefs.tolist()), encoding="utf-8")
-    intercept_path.write_text(json.dumps(intercepts.tolist()), encoding="utf-8")
+    write_json(coef_path, coefs)
+    write_json(intercept_path, intercepts)
     return {
         "coefficients_file": coef_path.name,
         "intercepts_file": intercept_path.name,
@@ -100,6 +114,9 @@ def main() -> None:
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Imported here so --help and argument errors don't pay for joblib
+    import joblib
+
     vectorizer = joblib.load(artifacts_dir / "vectorizer.joblib")
     classifier = joblib.load(artifacts_dir / "ovr_lr.joblib")
     labels = (artifacts_dir / "labels.txt").read_text(encoding="utf-8").splitlines()
@@ -114,7 +131,7 @@ def main() -> None:
         "vectorizer": vectorizer_info,
         "classifier": classifier_info,
     }
-    (output_dir / "metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    write_json(output_dir / "metadata.json", metadata, indent=True)
     print(f"Exported JSON artifacts to {output_dir}")
 
 
@@ -10,6 +10,7 @@ emits both severity scores (0..1) and binary flags for every label, plus a joine
     python label-comments.py --input data/processed/merged/merged_comments.csv --output data/processed/labeled/labeled_comments.csv
     python label-comments.py --input ... --output ... --threshold 0.4
     python label-comments.py --input ... --pattern-dir patterns --extra-patterns-dir custom
+    python label-comments.py --input ... --workers 4
 
 All regex lists contain offensive language purely for detection purposes.
 """
@@ -17,11 +18,16 @@ All regex lists contain offensive language purely for detection purposes.
 from __future__ import annotations
 import argparse
 import csv
+import os
 import re
+import warnings
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
@@ -39,6 +45,13 @@ LABELS = [
     "racism",
 ]
 
+# Output column names per label, built once rather than formatted for every comment
+SCORE_KEYS = {lab: f"{lab}_score" for lab in LABELS}
+BIN_KEYS = {lab: f"{lab}_bin" for lab in LABELS}
+
+# Stronger classes that the baseline toxic score mirrors
+TOXIC_CO_LABELS = ["severe_toxic", "threat", "obscene", "insult", "identity_hate", "racism"]
+
 DEFAULT_PATTERN_DIR = Path(__file__).resolve().parent / "patterns"
 
 # Negation tokens and window (in tokens) to suppress false positives like "not stupid"
@@ -59,6 +72,9 @@ MAX_SCORE_PER_LABEL = 1.0
 COUNT_WEIGHT = 0.50
 INTENSITY_WEIGHT = 0.15
 
+# Rows handed to each worker process at a time when --workers > 1
+WORKER_CHUNKSIZE = 256
+
 
 @dataclass
 class PatternSpec:
@@ -111,6 +127,28 @@ def load_pattern_dir(dirpath: Path, allow_missing: bool = False) -> Dict[str, Li
     return out
 
 
+# Backreferences and conditionals refer to group numbers, which shift once patterns are joined
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+# Global inline flags such as (?x) would apply to the whole alternation (only a warning before 3.11)
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def build_prefilter(patterns_all: Dict[str, List[PatternSpec]]) -> re.Pattern | None:
+    """
+    Join every pattern into one alternation so a comment that matches nothing is rejected in a single scan.
+    Returns None when the library cannot be safely combined; callers then score every comment in full.
+    """
+    sources = [spec.regex.pattern for specs in patterns_all.values() for spec in specs]
+    if not sources or any(_GROUP_REFERENCE.search(src) or _GLOBAL_FLAGS.search(src) for src in sources):
+        return None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            return re.compile("|".join(f"(?:{src})" for src in sources), re.IGNORECASE)
+    except (re.error, DeprecationWarning):
+        return None
+
+
 # -----------------------------
 # Core
 # -----------------------------
@@ -127,10 +165,24 @@ def has_negation(tokens: List[str], idx_start: int) -> bool:
     idx_start is an approximate start token index of matched phrase.
     """
     left = max(0, idx_start - NEGATION_WINDOW)
-    for t in tokens[left:idx_start]:
-        if t in NEGATORS:
-            return True
-    return False
+    return not NEGATORS.isdisjoint(tokens[left:idx_start])
+
+
+def token_positions(text: str, tokens: List[str]) -> List[int]:
+    """Approximate start char position of each token in text (non-decreasing)."""
+    lowered = text.lower()
+    starts = []
+    cur = 0
+    for tok in tokens:
+        # find tok in text starting from cur
+        j = lowered.find(tok, cur)
+        if j < 0:
+            # fallback: keep same cur
+            starts.append(cur)
+        else:
+            starts.append(j)
+            cur = j + len(tok)
+    return starts
 
 
 def match_with_negation(text: str, tokens: List[str], patterns: List[PatternSpec]) -> Tuple[int, float]:
@@ -141,29 +193,15 @@ def match_with_negation(text: str, tokens: List[str], patterns: List[PatternSpec
     count = 0   
     intensity_sum = 0.0
 
-    # Map char positions to token indices to approximate start index
-    pos_to_tok = []
-    cur = 0
-    for i, tok in enumerate(tokens):
-        # find tok in text starting from cur
-        j = text.lower().find(tok, cur)
-        if j < 0:
-            # fallback: keep same cur
-            pos_to_tok.append((i, cur))
-        else:
-            pos_to_tok.append((i, j))
-            cur = j + len(tok)
+    # Built on the first match only: most comments match no pattern for most labels
+    token_starts = None
 
     for spec in patterns:
         for m in spec.regex.finditer(text):
-            start = m.start()
-            # approximate token index: nearest token whose start pos <= start
-            tok_idx = 0
-            for i, pos in pos_to_tok:
-                if pos <= start:
-                    tok_idx = i
-                else:
-                    break
+            if token_starts is None:
+                token_starts = token_positions(text, tokens)
+            # approximate token index: nearest token whose start pos <= match start
+            tok_idx = max(0, bisect_right(token_starts, m.start()) - 1)
             if not has_negation(tokens, tok_idx):
                 count += 1
                 intensity_sum += spec.intensity
@@ -177,12 +215,14 @@ def score_label(text: str, tokens: List[str], patterns: List[PatternSpec]) -> fl
     return min(MAX_SCORE_PER_LABEL, raw)
 
 
-def annotate_text(text: str, patterns_all: Dict[str, List[PatternSpec]]) -> Dict[str, float]:
+def annotate_text(text: str, patterns_all: Dict[str, List[PatternSpec]], prefilter: re.Pattern | None = None) -> Dict[str, float]:
     if not isinstance(text, str):
         text = ""
     stripped = text.strip()
     if stripped == "" or stripped.lower().startswith("http"):
-        return {f"{lab}_score": 0.0 for lab in LABELS}
+        return dict.fromkeys(SCORE_KEYS.values(), 0.0)
+    if prefilter is not None and prefilter.search(stripped) is None:
+        return dict.fromkeys(SCORE_KEYS.values(), 0.0)
 
     tokens = tokenize(stripped)
 
@@ -190,21 +230,65 @@ def annotate_text(text: str, patterns_all: Dict[str, List[PatternSpec]]) -> Dict
     # compute per-label score
     for lab in LABELS:
         pat = patterns_all.get(lab, [])
-        scores[f"{lab}_score"] = score_label(stripped, tokens, pat)
+        scores[SCORE_KEYS[lab]] = score_label(stripped, tokens, pat)
 
     # Ensure baseline toxic label mirrors stronger classes so single insults count as toxic
-    co = ["severe_toxic", "threat", "obscene", "insult", "identity_hate", "racism"]
-    max_co = max(scores[f"{c}_score"] for c in co)
+    max_co = max(scores[SCORE_KEYS[c]] for c in TOXIC_CO_LABELS)
     scores["toxic_score"] = max(scores["toxic_score"], max_co)
 
     return scores
 
 
 def to_binary(scores: Dict[str, float], threshold: float) -> Dict[str, int]:
-    bins = {}
-    for lab in LABELS:
-        bins[f"{lab}_bin"] = 1 if scores[f"{lab}_score"] >= threshold else 0
-    return bins
+    return {BIN_KEYS[lab]: 1 if scores[SCORE_KEYS[lab]] >= threshold else 0 for lab in LABELS}
+
+
+# Pattern library and prefilter installed in each worker process by _init_worker
+_WORKER_PATTERNS: Dict[str, List[PatternSpec]] = {}
+_WORKER_PREFILTER: re.Pattern | None = None
+
+
+def _init_worker(patterns_all: Dict[str, List[PatternSpec]], prefilter: re.Pattern | None) -> None:
+    global _WORKER_PATTERNS, _WORKER_PREFILTER
+    _WORKER_PATTERNS = patterns_all
+    _WORKER_PREFILTER = prefilter
+
+
+def _annotate_in_worker(text: str) -> Dict[str, float]:
+    return annotate_text(text, _WORKER_PATTERNS, _WORKER_PREFILTER)
+
+
+def iter_annotations(
+    texts: Iterable[str],
+    patterns_all: Dict[str, List[PatternSpec]],
+    workers: int = 1,
+    prefilter: re.Pattern | None = None,
+) -> Iterator[Dict[str, float]]:
+    """
+    Yield annotate_text() results in input order.
+    With workers > 1 the regex scoring is spread over a process pool, since it is pure CPU work.
+    """
+    if workers <= 1:
+        for text in texts:
+            yield annotate_text(text, patterns_all, prefilter)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(patterns_all, prefilter)) as executor:
+        yield from executor.map(_annotate_in_worker, texts, chunksize=WORKER_CHUNKSIZE)
+
+
+def write_csv_atomic(df: pd.DataFrame, path: Path) -> None:
+    """
+    Write df to a temp file beside path, then os.replace() it into place.
+    With --inplace this guarantees an interrupted run never leaves a truncated input file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        df.to_csv(tmp, index=False, quoting=csv.QUOTE_MINIMAL)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
 
 
 def main():
@@ -215,6 +299,7 @@ def main():
     ap.add_argument("--threshold", type=float, default=DEFAULT_BIN_THRESHOLD, help="binary threshold for *_score (default: 0.5)")
     ap.add_argument("--pattern-dir", type=str, default=None, help="base pattern directory (defaults to patterns/ next to this script)")
     ap.add_argument("--extra-patterns-dir", type=str, default=None, help="optional dir containing <label>.tsv with extra regexes")
+    ap.add_argument("--workers", type=int, default=1, help="worker processes used for annotation (default: 1, no pool)")
     args = ap.parse_args()
 
     inp = Path(args.input)
@@ -248,39 +333,48 @@ def main():
         else:
             print(f"[WARN] extra patterns dir not found: {extra_dir}")
 
-    # Prepare output columns
-    for lab in LABELS:
-        df[f"{lab}_score"] = 0.0
-        df[f"{lab}_bin"] = 0
-    df["labels"] = ""
+    # Collect output values per column; per-cell df.at writes are far slower than whole-column assignment
+    score_values: Dict[str, List[float]] = {lab: [] for lab in LABELS}
+    bin_values: Dict[str, List[int]] = {lab: [] for lab in LABELS}
+    label_values: List[str] = []
+
+    prefilter = build_prefilter(patterns_all)
+    if prefilter is None:
+        print("[WARN] patterns could not be combined into a prefilter; scanning every pattern for every row")
+
+    # Short bodies ("lol", "[deleted]", ...) repeat a lot; annotate each distinct body once
+    codes, unique_bodies = pd.factorize(df["body"], use_na_sentinel=False)
 
-    print("Annotating rows (negation-aware, severity scoring)...")
-    for i, txt in enumerate(tqdm(df["body"], total=len(df))):
-        scores = annotate_text(txt, patterns_all)
+    print(f"Annotating {len(unique_bodies)} distinct bodies across {len(df)} rows (negation-aware, severity scoring)...")
+    for scores in tqdm(iter_annotations(unique_bodies, patterns_all, args.workers, prefilter), total=len(unique_bodies)):
         bins = to_binary(scores, args.threshold)
 
-        # write scores/bins
-        for k, v in scores.items():
-            df.at[i, k] = round(float(v), 4)
-        for k, v in bins.items():
-            df.at[i, k] = int(v)
+        for lab in LABELS:
+            score_values[lab].append(round(float(scores[SCORE_KEYS[lab]]), 4))
+            bin_values[lab].append(bins[BIN_KEYS[lab]])
 
         # build labels string (only for labels that passed threshold)
-        active = [lab for lab in LABELS if df.at[i, f"{lab}_bin"] == 1]
-        df.at[i, "labels"] = "|".join(active)
+        label_values.append("|".join(lab for lab in LABELS if bins[BIN_KEYS[lab]] == 1))
+
+    for lab in LABELS:
+        df[SCORE_KEYS[lab]] = pd.Series(np.asarray(score_values[lab], dtype="float64")[codes], index=df.index)
+        df[BIN_KEYS[lab]] = pd.Series(np.asarray(bin_values[lab], dtype="int64")[codes], index=df.index)
+    df["labels"] = pd.Series(np.asarray(label_values, dtype=object)[codes], index=df.index)
 
     print(f"Writing output to {out} ...")
-    df.to_csv(out, index=False, quoting=csv.QUOTE_MINIMAL)
+    write_csv_atomic(df, out)
 
     # Simple stats
+    bin_cols = list(BIN_KEYS.values())
+    label_totals = df[bin_cols].sum()
     print("\nLabel counts (binary, threshold >= {:.2f}):".format(args.threshold))
     for lab in LABELS:
-        c = int(df[f"{lab}_bin"].sum())
+        c = int(label_totals[BIN_KEYS[lab]])
         print(f"  {lab:14s}: {c}")
 
     source_col = "source_subreddit" if "source_subreddit" in df.columns else None
     total_rows = len(df)
-    toxic_rows = int(df["toxic_bin"].sum())
+    toxic_rows = int(label_totals["toxic_bin"])
     clean_rows = total_rows - toxic_rows
     toxic_pct = (toxic_rows / total_rows * 100) if total_rows else 0.0
     print(f"\nOverall toxic rows: {toxic_rows}/{total_rows} ({toxic_pct:.2f}%)")
@@ -288,17 +382,20 @@ def main():
 
     if source_col:
         print("\nPer-subreddit stats:")
+        # One grouped pass for every label instead of slicing a sub-frame per subreddit
         grouped = df.groupby(source_col, sort=True)
-        for subreddit, grp in grouped:
-            size = len(grp)
-            tox = int(grp["toxic_bin"].sum())
+        group_counts = grouped[bin_cols].sum()
+        group_sizes = grouped.size()
+        for subreddit, counts in group_counts.iterrows():
+            size = int(group_sizes[subreddit])
+            tox = int(counts["toxic_bin"])
             clean = size - tox
             pct = (tox / size * 100) if size else 0.0
             print(f"  r/{subreddit}: {tox}/{size} toxic ({pct:.2f}%), {clean} clean")
             for lab in LABELS:
                 if lab == "toxic":
                     continue
-                lab_count = int(grp[f"{lab}_bin"].sum())
+                lab_count = int(counts[BIN_KEYS[lab]])
                 if lab_count:
                     print(f"    {lab:14s}: {lab_count}")
 
@@ -3,13 +3,18 @@
 from __future__ import annotations
 
 import argparse
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import pandas as pd
 
 DATA_ROOT = Path(__file__).resolve().parent / "data" / "raw" / "reddit"
 DEFAULT_OUTPUT = Path(__file__).resolve().parent / "data" / "processed" / "merged" / "merged_comments.csv"
+DEFAULT_WORKERS = 4
 
 
 def find_comment_files(root: Path) -> List[Path]:
@@ -18,20 +23,57 @@ def find_comment_files(root: Path) -> List[Path]:
     return sorted(p for p in root.glob("**/comments.csv") if p.is_file())
 
 
-def merge_comment_csv(files: List[Path], root: Path) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
+def read_comment_csv(path: Path, root: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    try:
+        rel = path.relative_to(root)
+        source = rel.parts[0] if rel.parts else path.parent.name
+    except ValueError:
+        source = path.parent.name if path.parent != path else str(path)
+    df.insert(0, "source_subreddit", source)
+    return df
+
+
+def merged_columns(files: List[Path]) -> List[str]:
+    """Union of all input headers in first-seen order, matching what pd.concat would produce."""
+    columns: Dict[str, None] = {"source_subreddit": None}
     for path in files:
-        df = pd.read_csv(path, dtype=str, keep_default_na=False)
-        try:
-            rel = path.relative_to(root)
-            source = rel.parts[0] if rel.parts else path.parent.name
-        except ValueError:
-            source = path.parent.name if path.parent != path else str(path)
-        df.insert(0, "source_subreddit", source)
-        frames.append(df)
-    if not frames:
+        columns.update(dict.fromkeys(pd.read_csv(path, dtype=str, nrows=0).columns))
+    return list(columns)
+
+
+def merge_comment_csv(files: List[Path], root: Path, output_path: Path, workers: int = DEFAULT_WORKERS) -> int:
+    """
+    Stream every comments.csv into output_path and return the number of rows written.
+    Only about `workers` frames are held in memory at once instead of the whole merged dataset.
+    Rows go to a temp file that replaces output_path only after every input was read, so a failed
+    read leaves any existing merged file untouched.
+    """
+    if not files:
         raise ValueError("No comments.csv files found to merge.")
-    return pd.concat(frames, ignore_index=True)
+    columns = merged_columns(files)
+    workers = max(1, workers)
+    remaining = iter(files)
+    total_rows = 0
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    try:
+        # Reads are I/O bound; futures are consumed in submission order so the output keeps file order.
+        with ThreadPoolExecutor(max_workers=workers) as executor, tmp.open("w", encoding="utf-8", newline="") as handle:
+            pending = deque(executor.submit(read_comment_csv, path, root) for path in islice(remaining, workers))
+            first = True
+            while pending:
+                df = pending.popleft().result()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append(executor.submit(read_comment_csv, next_path, root))
+                df.reindex(columns=columns, fill_value="").to_csv(handle, index=False, header=first)
+                first = False
+                total_rows += len(df)
+        os.replace(tmp, output_path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return total_rows
 
 
 def parse_args() -> argparse.Namespace:
@@ -48,6 +90,12 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_OUTPUT,
         help="Destination CSV path (default: data/processed/merged/merged_comments.csv).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of CSV files to read concurrently (default: {DEFAULT_WORKERS}).",
+    )
     return parser.parse_args()
 
 
@@ -57,12 +105,10 @@ def main() -> None:
     if not comment_files:
         raise SystemExit(f"No comments.csv files found under {args.input_root}")
 
-    merged = merge_comment_csv(comment_files, args.input_root)
-
     output_path = args.output
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    merged.to_csv(output_path, index=False)
-    print(f"Merged {len(comment_files)} files ({len(merged):,} rows) into {output_path}")
+    total_rows = merge_comment_csv(comment_files, args.input_root, output_path, args.workers)
+    print(f"Merged {len(comment_files)} files ({total_rows:,} rows) into {output_path}")
 
 
 if __name__ == "__main__":